@@ -1,15 +1,43 @@
 import os
-from collections import OrderedDict
+import sys
+from array import array
+from collections import OrderedDict, deque
+from itertools import islice
+
+# Reserved symbol ids; the remaining terminals follow, then non-terminals
+EPS_ID = 0  # ε
+EOF_ID = 1  # $
+
+# FIRST/FOLLOW sets are int bitsets with bit `id` set for each member
+EPS_BIT = 1 << EPS_ID
+
+# Canonical ε production; pooled productions can be compared by identity
+EPSILON_PROD = (EPS_ID,)
+
+# Parser actions recorded in the step log
+ACCEPT, MATCH, APPLY, ERROR_MISMATCH, ERROR_NO_RULE = range(5)
 
 class LL1Parser:
     def __init__(self):
         self.grammar = OrderedDict()
         self.non_terminals = []
+        self._non_terminals_set = set()
         self.terminals = []
-        self.first_sets = {}
-        self.follow_sets = {}
-        self.parse_table = {}
+        self.first_sets = []
+        self.follow_sets = []
+        self.parse_table = []
+        self.push_table = []
+        self._parse_fn = None
+        self.sym_id = {}
+        self.id_to_sym = []
+        self.num_terminals = 0
+        self.grammar_ids = []
+        self._prod_pool = {}
+        self.nt_index = {}
+        self.term_index = {}
         self.start_symbol = None
+        self.first_suffix = []
+        self.nullable = 0
 
     def read_grammar(self, file_path):
         """Read grammar from file"""
@@ -18,28 +46,27 @@ class LL1Parser:
             return False
             
         with open(file_path, 'r') as file:
-            lines = file.readlines()
-        
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            if '->' not in line:
-                print(f"Format error in line: {line}")
-                continue
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                    
+                head, arrow, body = line.partition('->')
+                if not arrow:
+                    print(f"Format error in line: {line}")
+                    continue
+                    
+                non_terminal = head.strip()
+                # Like split('->')[1], anything after a second '->' is ignored
+                body = body.partition('->')[0]
+                productions = [segment.split() for segment in body.split('|')]
                 
-            parts = line.split('->')
-            non_terminal = parts[0].strip()
-            productions = [p.split() for p in parts[1].split('|')]
-            
-            if non_terminal not in self.grammar:
-                self.grammar[non_terminal] = []
-                
-            self.grammar[non_terminal].extend(productions)
-            
-            if non_terminal not in self.non_terminals:
-                self.non_terminals.append(non_terminal)
+                if non_terminal not in self._non_terminals_set:
+                    self._non_terminals_set.add(non_terminal)
+                    self.non_terminals.append(non_terminal)
+                    self.grammar[non_terminal] = []
+                    
+                self.grammar[non_terminal].extend(productions)
         
         if not self.grammar:
             print("Error: No production rules found!")
@@ -47,224 +74,453 @@ class LL1Parser:
             
         self.start_symbol = list(self.grammar.keys())[0]
         self._find_terminals()
+        self._intern_symbols()
         return True
 
     def _find_terminals(self):
         """Find all terminals in the grammar"""
         terminals = set()
+        nts = self._non_terminals_set
         for non_terminal, productions in self.grammar.items():
             for production in productions:
                 for symbol in production:
-                    if symbol != 'ε' and symbol not in self.non_terminals:
+                    if symbol != 'ε' and symbol not in nts:
                         terminals.add(symbol)
         
         self.terminals = sorted(list(terminals))
         self.terminals.append('$')  # Add end of input marker
 
+    def _intern_symbols(self):
+        """Assign integer ids to all symbols and convert the grammar to ids"""
+        # ε and terminals come first, so `symbol < num_terminals` tests for them
+        self.id_to_sym = ['ε', '$'] + [t for t in self.terminals if t != '$']
+        self.num_terminals = len(self.id_to_sym)
+        self.id_to_sym.extend(self.non_terminals)
+        self.sym_id = {symbol: i for i, symbol in enumerate(self.id_to_sym)}
+        
+        self.nt_index = {nt: self.sym_id[nt] - self.num_terminals for nt in self.non_terminals}
+        self.term_index = {t: self.sym_id[t] for t in self.terminals}
+        # Identical right-hand sides share one tuple across the grammar and tables
+        self._prod_pool = {EPSILON_PROD: EPSILON_PROD}
+        self.grammar_ids = []
+        for nt in self.non_terminals:
+            productions = []
+            for production in self.grammar[nt]:
+                production = tuple(self.sym_id[symbol] for symbol in production)
+                productions.append(self._prod_pool.setdefault(production, production))
+            self.grammar_ids.append(productions)
+
     def compute_first_sets(self):
         """Compute FIRST sets for all non-terminals"""
-        self.first_sets = {nt: set() for nt in self.non_terminals}
-        changed = True
+        num_terminals = self.num_terminals
+        self.nullable = nullable = self._compute_nullable()
+        
+        # FIRST(A) = direct[A] ∪ FIRST(B) - {ε} for every B in begins_with[A],
+        # where begins_with[A] is a bitset row over non-terminal ids
+        direct = [0] * len(self.non_terminals)
+        begins_with = [0] * len(self.non_terminals)
+        for nt_id, productions in enumerate(self.grammar_ids):
+            for production in productions:
+                for symbol in production:
+                    if symbol < num_terminals:
+                        if symbol != EPS_ID:
+                            direct[nt_id] |= 1 << symbol
+                        break
+                    begins_with[nt_id] |= 1 << (symbol - num_terminals)
+                    if not nullable >> (symbol - num_terminals) & 1:
+                        break
+            if nullable >> nt_id & 1:
+                direct[nt_id] |= EPS_BIT
+        
+        # Saturate first = first | begins_with · first one SCC at a time,
+        # visiting components after everything they depend on
+        self.first_sets = direct
+        rows = [list(self._iter_bits(row)) for row in begins_with]
         
-        while changed:
-            changed = False
-            for non_terminal in self.non_terminals:
-                for production in self.grammar[non_terminal]:
-                    first_set = self._compute_first_for_sequence(production)
-                    if not first_set.issubset(self.first_sets[non_terminal]):
-                        self.first_sets[non_terminal].update(first_set)
+        for component in self._strongly_connected_components(rows):
+            changed = True
+            while changed:
+                changed = False
+                for nt_id in component:
+                    first_set = self.first_sets[nt_id]
+                    for other in rows[nt_id]:
+                        first_set |= self.first_sets[other] & ~EPS_BIT
+                    if first_set != self.first_sets[nt_id]:
+                        self.first_sets[nt_id] = first_set
                         changed = True
+                # A single non-terminal is final after one pass
+                if len(component) == 1:
+                    break
+        
+        # FIRST sets are final now, so every production suffix can be fixed too
+        self.first_suffix = [
+            [self._compute_first_suffixes(production) for production in productions]
+            for productions in self.grammar_ids
+        ]
         
         return self.first_sets
 
-    def _compute_first_for_sequence(self, sequence):
-        """Compute FIRST for a sequence of symbols"""
-        if not sequence:
-            return set()
-            
-        first_set = set()
-        for i, symbol in enumerate(sequence):
-            if symbol == 'ε':
-                first_set.add('ε')
-                break
-            elif symbol in self.terminals:
-                first_set.add(symbol)
-                break
+    def _compute_nullable(self):
+        """Return a bitset over non-terminal ids of those that derive ε"""
+        num_terminals = self.num_terminals
+        # pending[p] counts the non-terminals in production p's prefix not yet
+        # known to be nullable; uses[B] lists the productions waiting on B
+        pending = []
+        lhs = []
+        uses = [[] for _ in self.non_terminals]
+        worklist = []
+        nullable = 0
+        
+        for nt_id, productions in enumerate(self.grammar_ids):
+            for production in productions:
+                prefix = []
+                derives_eps = bool(production)
+                for symbol in production:
+                    if symbol < num_terminals:  # ε ends the scan, a terminal blocks it
+                        derives_eps = symbol == EPS_ID
+                        break
+                    prefix.append(symbol - num_terminals)
+                if not derives_eps:
+                    continue
+                if not prefix:
+                    if not nullable >> nt_id & 1:
+                        nullable |= 1 << nt_id
+                        worklist.append(nt_id)
+                    continue
+                for other in prefix:
+                    uses[other].append(len(pending))
+                pending.append(len(prefix))
+                lhs.append(nt_id)
+        
+        while worklist:
+            for production_id in uses[worklist.pop()]:
+                pending[production_id] -= 1
+                nt_id = lhs[production_id]
+                if pending[production_id] == 0 and not nullable >> nt_id & 1:
+                    nullable |= 1 << nt_id
+                    worklist.append(nt_id)
+        
+        return nullable
+
+    def _compute_first_suffixes(self, production):
+        """Compute FIRST(production[i:]) for every i, including the empty tail"""
+        first_sets = self.first_sets
+        nullable = self.nullable
+        num_terminals = self.num_terminals
+        suffixes = [0] * (len(production) + 1)
+        # FIRST of the empty tail stays empty, but a nullable last symbol
+        # still makes its suffix derive ε
+        tail = EPS_BIT
+        for i in range(len(production) - 1, -1, -1):
+            symbol = production[i]
+            if symbol < num_terminals:  # Terminal or ε
+                first_set = 1 << symbol
             else:  # Non-terminal
-                symbol_first = self.first_sets.get(symbol, set()).copy()
-                if 'ε' in symbol_first:
-                    symbol_first.remove('ε')
-                    first_set.update(symbol_first)
-                    if i == len(sequence) - 1:  # Last symbol
-                        first_set.add('ε')
+                nt_id = symbol - num_terminals
+                if nullable >> nt_id & 1:
+                    first_set = (first_sets[nt_id] & ~EPS_BIT) | tail
                 else:
-                    first_set.update(symbol_first)
-                    break
-        
-        return first_set
+                    first_set = first_sets[nt_id]
+            suffixes[i] = tail = first_set
+        return suffixes
 
     def compute_follow_sets(self):
         """Compute FOLLOW sets for all non-terminals"""
-        self.follow_sets = {nt: set() for nt in self.non_terminals}
-        self.follow_sets[self.start_symbol].add('$')
-        changed = True
+        self.follow_sets = [0] * len(self.non_terminals)
+        self.follow_sets[self.nt_index[self.start_symbol]] |= 1 << EOF_ID
+        num_terminals = self.num_terminals
+        # dependencies[A] holds every B with FOLLOW(A) ⊆ FOLLOW(B)
+        dependencies = [set() for _ in self.non_terminals]
         
-        while changed:
-            changed = False
-            for non_terminal in self.non_terminals:
-                for production in self.grammar[non_terminal]:
-                    for i, symbol in enumerate(production):
-                        if symbol in self.non_terminals:
-                            # Compute FIRST for the remainder of the sequence
-                            remainder = production[i+1:]
-                            first_remainder = self._compute_first_for_sequence(remainder)
-                            
-                            # Rule 1: Add First(β) to Follow(B) (except ε)
-                            new_follows = first_remainder - {'ε'}
-                            if not new_follows.issubset(self.follow_sets[symbol]):
-                                self.follow_sets[symbol].update(new_follows)
-                                changed = True
-                            
-                            # Rule 2: If ε in First(β) or β is empty
-                            if 'ε' in first_remainder or i == len(production) - 1:
-                                if not self.follow_sets[non_terminal].issubset(self.follow_sets[symbol]):
-                                    self.follow_sets[symbol].update(self.follow_sets[non_terminal])
-                                    changed = True
+        for nt_id, productions in enumerate(self.grammar_ids):
+            for production, suffixes in zip(productions, self.first_suffix[nt_id]):
+                for i, symbol in enumerate(production):
+                    if symbol >= num_terminals:
+                        target = symbol - num_terminals
+                        # FIRST for the remainder of the sequence
+                        first_remainder = suffixes[i+1]
+                        
+                        # Rule 1: Add First(β) to Follow(B) (except ε)
+                        self.follow_sets[target] |= first_remainder & ~EPS_BIT
+                        
+                        # Rule 2: If ε in First(β) or β is empty
+                        if first_remainder & EPS_BIT or i == len(production) - 1:
+                            if target != nt_id:
+                                dependencies[nt_id].add(target)
+        
+        # Propagate along the edges, revisiting a target only when it grew.
+        # A non-terminal is queued at most once, however often it grows meanwhile
+        follow_sets = self.follow_sets
+        worklist = deque(range(len(self.non_terminals)))
+        queued = [True] * len(self.non_terminals)
+        while worklist:
+            source = worklist.popleft()
+            queued[source] = False
+            source_follows = follow_sets[source]
+            for target in dependencies[source]:
+                missing = source_follows & ~follow_sets[target]
+                if missing:
+                    follow_sets[target] |= missing
+                    if not queued[target]:
+                        queued[target] = True
+                        worklist.append(target)
         
         return self.follow_sets
 
     def build_parse_table(self):
         """Build LL(1) parse table"""
-        self.parse_table = {}
-        
-        # Initialize table
-        for non_terminal in self.non_terminals:
-            for terminal in self.terminals:
-                self.parse_table[(non_terminal, terminal)] = None
+        # One sparse row per non-terminal, mapping terminal id -> production;
+        # only cells that hold a production are stored
+        self.parse_table = [{} for _ in self.non_terminals]
         
         # Fill table
-        for non_terminal in self.non_terminals:
-            for production in self.grammar[non_terminal]:
-                first_alpha = self._compute_first_for_sequence(production)
+        for nt_id, productions in enumerate(self.grammar_ids):
+            row = self.parse_table[nt_id]
+            for production, suffixes in zip(productions, self.first_suffix[nt_id]):
+                first_alpha = suffixes[0]
                 
-                for terminal in first_alpha:
-                    if terminal != 'ε':
-                        if self.parse_table[(non_terminal, terminal)] is not None:
-                            print(f"Warning: Conflict in parse table for ({non_terminal}, {terminal})")
-                        self.parse_table[(non_terminal, terminal)] = production
+                for terminal in self._iter_bits(first_alpha & ~EPS_BIT):
+                    if terminal in row:
+                        self._report_conflict(nt_id, terminal)
+                    row[terminal] = production
                 
-                if 'ε' in first_alpha:
-                    for terminal in self.follow_sets[non_terminal]:
-                        if self.parse_table[(non_terminal, terminal)] is not None:
-                            print(f"Warning: Conflict in parse table for ({non_terminal}, {terminal})")
-                        self.parse_table[(non_terminal, terminal)] = production
+                if first_alpha & EPS_BIT:
+                    for terminal in self._iter_bits(self.follow_sets[nt_id]):
+                        if terminal in row:
+                            self._report_conflict(nt_id, terminal)
+                        row[terminal] = production
+        
+        # Symbols each cell pushes, pre-reversed and with ε dropped
+        pushes = {id(production): production[::-1] for production in self._prod_pool.values()}
+        pushes[id(EPSILON_PROD)] = ()
+        self.push_table = [
+            {terminal: pushes[id(production)] for terminal, production in row.items()}
+            for row in self.parse_table
+        ]
+        self._parse_fn = self._make_parse_fn()
         
         return self.parse_table
 
-    def parse_input(self, input_string):
-        """Parse an input string using the parse table"""
-        stack = ['$', self.start_symbol]
-        input_string = input_string.split()
-        input_string.append('$')
-        pointer = 0
-        steps = []
-        accepted = False
+    def _make_parse_fn(self):
+        """Return a parse function bound to this grammar's push table"""
+        num_terminals = self.num_terminals
+        start_id = self.sym_id[self.start_symbol]
+        rows = self.push_table
         
-        while len(stack) > 0:
-            top = stack[-1]
-            current_input = input_string[pointer]
-            
-            step = {
-                'stack': ' '.join(stack),
-                'input': ' '.join(input_string[pointer:]),
-                'action': ''
-            }
-            
-            if top == '$' and current_input == '$':
-                step['action'] = 'Accept'
-                steps.append(step)
-                accepted = True
-                break
-            elif top in self.terminals:
-                if top == current_input:
+        def parse(input_ids):
+            stack = array('i', (EOF_ID, start_id))
+            log = []
+            pointer = 0
+            while stack:
+                top = stack[-1]
+                current_input = input_ids[pointer]
+                if top < num_terminals:
+                    if top == EOF_ID and current_input == EOF_ID:
+                        log.append((ACCEPT, top, pointer))
+                        return log, True
+                    if top != current_input:
+                        # ε pushed by a rule like `A -> ε b` has no rule, as in a non-terminal
+                        log.append((ERROR_NO_RULE if top == EPS_ID else ERROR_MISMATCH, top, pointer))
+                        return log, False
+                    log.append((MATCH, top, pointer))
                     stack.pop()
                     pointer += 1
-                    step['action'] = f'Match terminal: {top}'
                 else:
-                    step['action'] = f'Error: Expected {top} but got {current_input}'
-                    steps.append(step)
-                    break
-            else:  # Non-terminal
-                production = self.parse_table.get((top, current_input), None)
-                if production is not None:
+                    # One dict per non-terminal, so dispatch is O(1) at any grammar size
+                    push = rows[top - num_terminals].get(current_input)
+                    if push is None:
+                        log.append((ERROR_NO_RULE, top, pointer))
+                        return log, False
+                    log.append((APPLY, top, pointer))
                     stack.pop()
-                    if production != ['ε']:
-                        # Push production in reverse order
-                        for symbol in reversed(production):
-                            stack.append(symbol)
-                    step['action'] = f'Apply rule: {top} -> {" ".join(production)}'
-                else:
-                    step['action'] = f'Error: No rule for ({top}, {current_input})'
-                    steps.append(step)
-                    break
-            
-            steps.append(step)
+                    stack.extend(push)
+            return log, False
         
-        return steps, accepted
+        return parse
+
+    @staticmethod
+    def _strongly_connected_components(graph):
+        """Return the SCCs of an adjacency-list graph in reverse topological order (Tarjan)"""
+        index = [None] * len(graph)
+        lowlink = [0] * len(graph)
+        on_stack = [False] * len(graph)
+        stack = []
+        components = []
+        counter = 0
+        
+        for root in range(len(graph)):
+            if index[root] is not None:
+                continue
+            # Explicit (node, next edge) stack instead of recursion
+            work = [(root, 0)]
+            while work:
+                node, edge = work.pop()
+                if edge == 0:
+                    index[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                
+                descended = False
+                for i in range(edge, len(graph[node])):
+                    successor = graph[node][i]
+                    if index[successor] is None:
+                        work.append((node, i + 1))
+                        work.append((successor, 0))
+                        descended = True
+                        break
+                    elif on_stack[successor]:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                if descended:
+                    continue
+                
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+        
+        return components
+
+    @staticmethod
+    def _iter_bits(bits):
+        """Yield the ids whose bits are set, lowest first"""
+        while bits:
+            lsb = bits & -bits
+            yield lsb.bit_length() - 1
+            bits ^= lsb
+
+    def _report_conflict(self, nt_id, terminal):
+        """Warn about a parse table cell that already holds a production"""
+        print(f"Warning: Conflict in parse table for ({self.non_terminals[nt_id]}, {self.id_to_sym[terminal]})")
+
+    def parse_input(self, input_string):
+        """Parse an input string using the parse table
+        
+        Runs the parse function bound by build_parse_table and returns
+        ((tokens, log), accepted), where log holds one (action, top, pointer)
+        tuple per step; display_parsing_steps turns it back into readable rows.
+        """
+        tokens = input_string.split()
+        tokens.append('$')
+        if self._parse_fn is None:
+            print("Error: Parse table has not been built!")
+            return (tokens, []), False
+        
+        # Tokens that are not terminals of the grammar never match anything
+        input_ids = [self.term_index.get(token, -1) for token in tokens]
+        log, accepted = self._parse_fn(input_ids)
+        
+        return (tokens, log), accepted
+
+    def _expand_steps(self, steps):
+        """Replay a step log, yielding display-width (stack, input, action) strings per step"""
+        tokens, log = steps
+        if not log:
+            return
+        id_to_sym = self.id_to_sym
+        stack = [EOF_ID, self.sym_id[self.start_symbol]]
+        
+        for action, top, pointer in log:
+            # Only the visible prefix of the stack and input is ever joined
+            stack_str = self._clip_join(id_to_sym[symbol] for symbol in stack)
+            input_str = self._clip_join(islice(tokens, pointer, None))
+            
+            if action == ACCEPT:
+                text = 'Accept'
+            elif action == MATCH:
+                stack.pop()
+                text = f'Match terminal: {id_to_sym[top]}'
+            elif action == APPLY:
+                # The table is static, so the cell holds the rule that was applied
+                nt_id = top - self.num_terminals
+                column = self.term_index[tokens[pointer]]
+                production = self.parse_table[nt_id][column]
+                stack.pop()
+                stack.extend(self.push_table[nt_id][column])
+                text = f'Apply rule: {id_to_sym[top]} -> {" ".join(id_to_sym[s] for s in production)}'
+            elif action == ERROR_MISMATCH:
+                text = f'Error: Expected {id_to_sym[top]} but got {tokens[pointer]}'
+            else:
+                text = f'Error: No rule for ({id_to_sym[top]}, {tokens[pointer]})'
+            
+            if len(text) > 28:
+                text = text[:28] + "..."
+            yield stack_str, input_str, text
+
+    @staticmethod
+    def _clip_join(words, width=28):
+        """Join words with spaces, truncated like a parsing steps column"""
+        parts = []
+        length = -1
+        for word in words:
+            parts.append(word)
+            length += len(word) + 1
+            if length > width:  # Later words cannot show up in the clipped text
+                break
+        text = ' '.join(parts)
+        return text[:width] + "..." if len(text) > width else text
 
     def display_first_sets(self):
         """Display FIRST sets"""
-        print("\nFIRST Sets:")
-        print("=" * 50)
-        for non_terminal, first_set in self.first_sets.items():
-            print(f"FIRST({non_terminal}) = {{{', '.join(sorted(first_set))}}}")
+        lines = ["\nFIRST Sets:", "=" * 50]
+        for non_terminal, first_set in zip(self.non_terminals, self.first_sets):
+            lines.append(f"FIRST({non_terminal}) = {{{', '.join(sorted(self.id_to_sym[s] for s in self._iter_bits(first_set)))}}}")
+        self._write_lines(lines)
 
     def display_follow_sets(self):
         """Display FOLLOW sets"""
-        print("\nFOLLOW Sets:")
-        print("=" * 50)
-        for non_terminal, follow_set in self.follow_sets.items():
-            print(f"FOLLOW({non_terminal}) = {{{', '.join(sorted(follow_set))}}}")
+        lines = ["\nFOLLOW Sets:", "=" * 50]
+        for non_terminal, follow_set in zip(self.non_terminals, self.follow_sets):
+            lines.append(f"FOLLOW({non_terminal}) = {{{', '.join(sorted(self.id_to_sym[s] for s in self._iter_bits(follow_set)))}}}")
+        self._write_lines(lines)
 
     def display_parse_table(self):
         """Display parse table"""
-        print("\nLL(1) Parse Table:")
-        print("=" * 80)
+        lines = ["\nLL(1) Parse Table:", "=" * 80]
         
         # Header
-        header = ["Non-Terminal"] + self.terminals
-        print("{:<15}".format(header[0]), end="")
-        for terminal in header[1:]:
-            print("{:<20}".format(terminal), end="")
-        print()
+        lines.append("{:<15}".format("Non-Terminal") + "".join(f"{terminal:<20}" for terminal in self.terminals))
         
         # Rows
-        for non_terminal in self.non_terminals:
-            print("{:<15}".format(non_terminal), end="")
-            for terminal in self.terminals:
-                production = self.parse_table.get((non_terminal, terminal), None)
-                if production is not None:
-                    production_str = f"{non_terminal} -> {' '.join(production)}"
-                    print("{:<20}".format(production_str[:18] + "..." if len(production_str) > 18 else production_str), end="")
-                else:
-                    print("{:<20}".format(""), end="")
-            print()
+        columns = [self.term_index[terminal] for terminal in self.terminals]
+        # Before build_parse_table every row is empty, as in the baseline
+        rows = self.parse_table or [{} for _ in self.non_terminals]
+        for non_terminal, row in zip(self.non_terminals, rows):
+            cells = [f"{self._format_table_cell(non_terminal, row.get(column)):<20}" for column in columns]
+            lines.append("{:<15}".format(non_terminal) + "".join(cells))
+        
+        self._write_lines(lines)
+
+    def _format_table_cell(self, non_terminal, production):
+        """Format a parse table cell, truncated to fit its column"""
+        if production is None:
+            return ""
+        production_str = f"{non_terminal} -> {' '.join(self.id_to_sym[s] for s in production)}"
+        return production_str[:18] + "..." if len(production_str) > 18 else production_str
 
     def display_parsing_steps(self, steps, accepted):
         """Display parsing steps"""
-        print("\nParsing Steps:")
-        print("=" * 80)
-        print("{:<30} {:<30} {:<30}".format("Stack", "Input", "Action"))
-        print("-" * 80)
-        
-        for step in steps:
-            print("{:<30} {:<30} {:<30}".format(
-                step['stack'][:28] + "..." if len(step['stack']) > 28 else step['stack'],
-                step['input'][:28] + "..." if len(step['input']) > 28 else step['input'],
-                step['action'][:28] + "..." if len(step['action']) > 28 else step['action']
-            ))
-        
-        print("\nResult: " + ("Input accepted!" if accepted else "Input rejected!"))
+        row_format = "{:<30} {:<30} {:<30}".format
+        lines = ["\nParsing Steps:", "=" * 80, row_format("Stack", "Input", "Action"), "-" * 80]
+        lines.extend(row_format(*step) for step in self._expand_steps(steps))
+        lines.append("\nResult: " + ("Input accepted!" if accepted else "Input rejected!"))
+        self._write_lines(lines)
+
+    @staticmethod
+    def _write_lines(lines):
+        """Write a whole display block to stdout in one call"""
+        # Looked up per call so redirected stdout is respected
+        out = sys.stdout
+        out.write("\n".join(lines) + "\n")
+        out.flush()
 
 def main():
     """Main function and user interface"""